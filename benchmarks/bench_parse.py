@@ -0,0 +1,157 @@
+"""Benchmark parse() and config() for every registered scheme.
+
+Every case is timed with the parse cache disabled, so the numbers reflect the
+cost of actually parsing a URL. Peak memory per call is measured with
+tracemalloc.
+
+Usage::
+
+    python benchmarks/bench_parse.py              # print results
+    python benchmarks/bench_parse.py --save       # store them as the baseline
+    python benchmarks/bench_parse.py --compare    # fail on regressions
+    python benchmarks/bench_parse.py --compare --threshold 25 -k postgres
+
+Timings depend on the machine, so the baseline should be regenerated (with
+``--save``) on the machine that runs ``--compare``, and whenever schemes are
+added: ``--compare`` reports cases missing from the baseline without checking
+them.
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dj_database_url
+
+BASELINE = Path(__file__).with_name("baseline.json")
+QUERY_SIZES = (0, 10, 200)
+ENV = "BENCHMARK_DATABASE_URL"
+
+
+def build_url(scheme: str, params: int) -> str:
+    url = f"{scheme}://user:p%40ssword@db.example.com:5432/name"
+    if params:
+        values = ("1", "true", "value", "a%20b")
+        query = "&".join(f"param{i}={values[i % len(values)]}" for i in range(params))
+        url = f"{url}?{query}"
+    return url
+
+
+def cases() -> Iterator[tuple[str, Callable[[], object]]]:
+    for scheme in sorted(dj_database_url.ENGINE_SCHEMES):
+        for params in QUERY_SIZES:
+            url = build_url(scheme, params)
+            for extras in (False, True):
+                kwargs: dict[str, Any] = {}
+                if extras:
+                    kwargs = {"ssl_require": True, "test_options": {"NAME": "test"}}
+                suffix = f"{scheme}[params={params},extras={extras}]"
+
+                def run_parse(
+                    url: str = url, kwargs: dict[str, Any] = kwargs
+                ) -> object:
+                    return dj_database_url.parse(url, **kwargs)
+
+                def run_config(
+                    url: str = url, kwargs: dict[str, Any] = kwargs
+                ) -> object:
+                    os.environ[ENV] = url
+                    return dj_database_url.config(env=ENV, **kwargs)
+
+                yield f"parse:{suffix}", run_parse
+                yield f"config:{suffix}", run_config
+
+
+def measure(func: Callable[[], object], repeat: int) -> dict[str, float]:
+    timer = timeit.Timer(func)
+    # calibrate so that each repeat takes roughly 20ms
+    number = max(int(0.02 / max(timer.timeit(number=10) / 10, 1e-9)), 1)
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    func()  # warm up before measuring memory
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"time_us": round(best * 1e6, 2), "peak_bytes": peak - start}
+
+
+def run(pattern: str, repeat: int) -> dict[str, dict[str, float]]:
+    dj_database_url.PARSE_CACHE.maxsize = 0
+    results = {}
+    for name, func in cases():
+        if pattern in name:
+            results[name] = measure(func, repeat)
+            print(
+                f"{name:60} {results[name]['time_us']:10.2f} us"
+                f" {results[name]['peak_bytes']:10.0f} B"
+            )
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            print(f"MISSING {name}: not in the baseline", file=sys.stderr)
+            continue
+        for metric, value in result.items():
+            limit = expected[metric] * (1 + threshold / 100)
+            if value > limit:
+                regressions.append(
+                    f"{name} {metric}: {value:.2f} > {expected[metric]:.2f}"
+                    f" (+{threshold:g}% allowed)"
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-k", dest="pattern", default="", help="only run matching cases"
+    )
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="write the baseline")
+    parser.add_argument("--compare", action="store_true", help="check the baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=25.0,
+        help="allowed slowdown in percent before --compare fails (default: 25)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.pattern, args.repeat)
+
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    if args.save:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Measure how parse() throughput scales with the number of threads.
+
+Every thread parses its own URLs with the parse cache disabled, while an
+optional writer thread keeps registering schemes. On a free-threaded build
+(``python3.13t``) throughput should grow with the thread count, as parsing
+reads the engine registry without locking; with the GIL it stays flat.
+
+Usage::
+
+    python3.13t benchmarks/bench_threads.py
+    python3.13t benchmarks/bench_threads.py --threads 1,2,4,8,16 --register
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dj_database_url
+
+
+def gil_enabled() -> bool:
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def throughput(threads: int, parses: int) -> float:
+    barrier = threading.Barrier(threads + 1)
+
+    def work(thread: int) -> None:
+        urls = [
+            f"postgres://tenant_{thread}_{i}:pw@db.example.com:5432/app?sslmode=require"
+            for i in range(100)
+        ]
+        barrier.wait()
+        for i in range(parses):
+            dj_database_url.parse(urls[i % len(urls)], conn_max_age=600)
+
+    workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return threads * parses / (time.perf_counter() - start)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", default="1,2,4,8")
+    parser.add_argument("--parses", type=int, default=20_000, help="per thread")
+    parser.add_argument(
+        "--register",
+        action="store_true",
+        help="register schemes from another thread while parsing",
+    )
+    args = parser.parse_args(argv)
+    dj_database_url.PARSE_CACHE.maxsize = 0
+
+    stop = threading.Event()
+    writer = None
+    if args.register:
+
+        def register() -> None:
+            i = 0
+            while not stop.is_set():
+                dj_database_url.register(f"bench-{i % 100}", "bench.backend")
+                i += 1
+                time.sleep(0.001)
+
+        writer = threading.Thread(target=register)
+        writer.start()
+
+    print(f"{sys.version.split()[0]}, GIL {'enabled' if gil_enabled() else 'disabled'}")
+    single = None
+    try:
+        for threads in (int(count) for count in args.threads.split(",")):
+            rate = throughput(threads, args.parses)
+            single = single or rate
+            print(
+                f"{threads:3} threads {rate:12,.0f} parses/s"
+                f" {rate / single:6.2f}x of 1 thread"
+            )
+    finally:
+        stop.set()
+        if writer is not None:
+            writer.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
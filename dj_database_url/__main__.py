@@ -0,0 +1,126 @@
+"""Command line interface.
+
+``python -m dj_database_url check`` runs the checks of
+``dj_database_url.checks`` over database URLs, without Django settings, and
+exits with status 1 if any problem is found::
+
+    python -m dj_database_url check --conn-max-age 600 \\
+        "postgres://db/app" "reporting=postgres://db:5432/app?sslmode=require"
+    python -m dj_database_url check --file databases.txt \\
+        --workers 4 --threads 8 --max-connections 100
+
+URLs are given as ``URL`` or ``ALIAS=URL`` arguments, or as ``alias=url``
+lines of ``--file``; without either, ``DATABASE_URL`` is checked as
+``default``. Passwords are not resolved, so secret references need not be
+reachable.
+"""
+
+import argparse
+import os
+import sys
+from collections.abc import Iterator
+from typing import Any
+
+from django.db import DEFAULT_DB_ALIAS
+
+import dj_database_url
+from dj_database_url.checks import check_databases
+
+
+def _conn_max_age(value: str) -> int | None:
+    return None if value.lower() == "none" else int(value)
+
+
+def _split_alias(argument: str, default: str) -> tuple[str, str]:
+    alias, sep, url = argument.partition("=")
+    if sep and "://" not in alias:
+        return alias.strip(), url.strip()
+    return default, argument
+
+
+def _urls(args: argparse.Namespace) -> Iterator[tuple[str, str]]:
+    for i, argument in enumerate(args.urls):
+        yield _split_alias(argument, DEFAULT_DB_ALIAS if i == 0 else f"url{i}")
+    if args.file:
+        with open(args.file) as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield _split_alias(line, f"line{number}")
+    if not args.urls and not args.file:
+        url = os.environ.get(dj_database_url.DEFAULT_ENV)
+        if url:
+            yield DEFAULT_DB_ALIAS, url
+
+
+def check(args: argparse.Namespace) -> int:
+    databases: dict[str, dict[str, Any]] = {}
+    errors = 0
+    for alias, url in _urls(args):
+        try:
+            databases[alias] = dict(
+                dj_database_url.parse_url(
+                    url,
+                    conn_max_age=args.conn_max_age,
+                    conn_health_checks=args.conn_health_checks,
+                ).to_django()
+            )
+        except ValueError as e:
+            print(f"{alias}: {e}")
+            errors += 1
+    problems = [
+        problem
+        for problem in check_databases(
+            databases,
+            workers=args.workers,
+            threads=args.threads,
+            max_connections=args.max_connections,
+            check_conn_max_age=args.check_conn_max_age,
+        )
+        if problem.id not in args.ignore
+    ]
+    for problem in problems:
+        print(f"{problem.alias}: ({problem.id}) {problem.msg}\n\tHINT: {problem.hint}")
+    count = len(problems) + errors
+    print(
+        f"Checked {len(databases)} database(s):"
+        f" {count or 'no'} issue{'' if count == 1 else 's'}."
+    )
+    return 1 if count else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m dj_database_url")
+    commands = parser.add_subparsers(dest="command", required=True)
+    check_parser = commands.add_parser(
+        "check", help="check database URLs for settings that hurt throughput"
+    )
+    check_parser.add_argument("urls", nargs="*", metavar="[ALIAS=]URL")
+    check_parser.add_argument("--file", help="file of alias=url lines")
+    check_parser.add_argument(
+        "--conn-max-age", type=_conn_max_age, default=0, help="seconds or 'none'"
+    )
+    check_parser.add_argument("--conn-health-checks", action="store_true")
+    check_parser.add_argument(
+        "--check-conn-max-age",
+        action="store_true",
+        help="warn about CONN_MAX_AGE=0 (W001)",
+    )
+    check_parser.add_argument("--workers", type=int, help="processes per deployment")
+    check_parser.add_argument("--threads", type=int, help="threads per process")
+    check_parser.add_argument(
+        "--max-connections", type=int, help="connection limit of each server"
+    )
+    check_parser.add_argument(
+        "--ignore", action="append", default=[], metavar="ID", help="e.g. W001"
+    )
+    args = parser.parse_args(argv)
+    args.ignore = {
+        name if name.startswith("dj_database_url.") else f"dj_database_url.{name}"
+        for name in args.ignore
+    }
+    return check(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.core import checks
+
+from dj_database_url.checks import TAG, check_database_settings
+
+
+class DjDatabaseUrlConfig(AppConfig):
+    name = "dj_database_url"
+    verbose_name = "dj-database-url"
+
+    def ready(self) -> None:
+        checks.register(check_database_settings, TAG)  # pyright: ignore[reportUnknownMemberType]
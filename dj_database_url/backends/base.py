@@ -0,0 +1,40 @@
+"""Generic ``ENGINE`` that adds mixins to another database backend.
+
+``dj_database_url.wrap_engine()`` points ``ENGINE`` here and records the real
+backend in ``WRAPPED_ENGINE`` and the mixins, as dotted paths, in
+``ENGINE_MIXINS``. Django then builds connections from a subclass of the real
+``DatabaseWrapper`` with those mixins in front, so any registered scheme can be
+wrapped without per-engine code.
+"""
+
+from functools import cache
+from typing import Any
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.utils import load_backend  # pyright: ignore[reportUnknownVariableType]
+from django.utils.module_loading import (
+    import_string,  # pyright: ignore[reportUnknownVariableType]
+)
+
+
+@cache
+def wrapper_class(engine: str, mixins: tuple[str, ...]) -> type[Any]:
+    """Returns the ``DatabaseWrapper`` of ``engine`` extended with ``mixins``."""
+    base = load_backend(engine).DatabaseWrapper
+    bases = tuple(import_string(mixin) for mixin in mixins)
+    return type(
+        base.__name__,
+        (*bases, base),
+        {"__module__": __name__, "__qualname__": base.__qualname__},
+    )
+
+
+class DatabaseWrapper:
+    def __new__(
+        cls, settings_dict: dict[str, Any], alias: str = DEFAULT_DB_ALIAS
+    ) -> Any:
+        klass = wrapper_class(
+            settings_dict["WRAPPED_ENGINE"],
+            tuple(settings_dict.get("ENGINE_MIXINS", ())),
+        )
+        return klass(settings_dict, alias)
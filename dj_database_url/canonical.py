@@ -0,0 +1,142 @@
+"""Canonical forms of database configs, to find aliases for the same database.
+
+``postgres://``, ``postgresql://`` and ``pgsql://`` URLs, query parameters in
+any order and an omitted or explicit default port all give the same canonical
+form, so aliases that only spell the same database differently (and each open
+their own connections) can be found with ``find_duplicate_aliases()``.
+"""
+
+import hashlib
+import json
+import urllib.parse as urlparse
+from collections.abc import Iterator, Mapping, MutableMapping
+from typing import Any, cast
+
+from django.db import DEFAULT_DB_ALIAS
+
+# Port used when a URL omits it, by backend (ENGINE)
+DEFAULT_PORTS: dict[str, int] = {
+    "django.db.backends.postgresql": 5432,
+    "django.contrib.gis.db.backends.postgis": 5432,
+    "timescale.db.backends.postgresql": 5432,
+    "timescale.db.backends.postgis": 5432,
+    "django_redshift_backend": 5439,
+    "django_cockroachdb": 26257,
+    "django.db.backends.mysql": 3306,
+    "django.contrib.gis.db.backends.mysql": 3306,
+    "mysql.connector.django": 3306,
+    "django.db.backends.oracle": 1521,
+    "django.contrib.gis.db.backends.oracle": 1521,
+    "mssql": 1433,
+    "sql_server.pyodbc": 1433,
+}
+
+
+def canonical_form(config: Mapping[str, Any]) -> str:
+    """Returns a URL-like string identifying the database ``config`` uses.
+
+    The scheme is the backend (unwrapped if instrumented), the port defaults
+    to the backend's and options are sorted, with nested options flattened to
+    dotted names. The password is left out; see ``fingerprint()``.
+    """
+    engine = config.get("WRAPPED_ENGINE") or config.get("ENGINE", "")
+    quote = urlparse.quote
+    netloc = quote(config.get("HOST") or "", safe=",")
+    port = _canonical_port(engine, config.get("PORT"))
+    if port:
+        netloc = f"{netloc}:{port}"
+    user = config.get("USER")
+    if user:
+        netloc = f"{quote(user, safe='')}@{netloc}"
+    options = urlparse.urlencode(sorted(_flatten(config.get("OPTIONS") or {})))
+    form = f"{engine}://{netloc}/{quote(config.get('NAME') or '', safe='/')}"
+    return f"{form}?{options}" if options else form
+
+
+def fingerprint(config: Mapping[str, Any]) -> str:
+    """Returns a stable hash of ``canonical_form()`` and the password.
+
+    A password reference counts instead of the secret it resolved to, so the
+    fingerprint survives credential rotation.
+    """
+    password = config.get("PASSWORD_REFERENCE") or config.get("PASSWORD") or ""
+    data = f"{canonical_form(config)}\n{password}".encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+def find_duplicate_aliases(
+    databases: Mapping[str, Mapping[str, Any]],
+) -> dict[str, list[str]]:
+    """Maps the first alias of each database used by several aliases to the
+    others, e.g. ``{"default": ["reporting", "celery"]}``.
+
+    ``default`` always comes first. Private in-memory SQLite databases are
+    never duplicates.
+    """
+    groups: dict[str, list[str]] = {}
+    aliases = sorted(databases, key=lambda alias: alias != DEFAULT_DB_ALIAS)
+    for alias in aliases:
+        config = databases[alias]
+        if _is_private(config):
+            continue
+        groups.setdefault(fingerprint(config), []).append(alias)
+    return {group[0]: group[1:] for group in groups.values() if len(group) > 1}
+
+
+def mirror_duplicate_aliases(
+    databases: Mapping[str, MutableMapping[str, Any]],
+) -> dict[str, list[str]]:
+    """Makes every duplicate alias a ``TEST["MIRROR"]`` of its first alias.
+
+    Aliases that already mirror an alias are left alone. Returns the
+    duplicates, as ``find_duplicate_aliases()``. Mirrors only change how the
+    test runner creates test databases: to share connections in production,
+    point the code at the first alias or route it there.
+    """
+    duplicates = find_duplicate_aliases(databases)
+    for primary, aliases in duplicates.items():
+        for alias in aliases:
+            test_settings = cast(
+                dict[str, Any], databases[alias].setdefault("TEST", {})
+            )
+            if not test_settings.get("MIRROR"):
+                test_settings["MIRROR"] = primary
+    return duplicates
+
+
+def _canonical_port(engine: str, port: object) -> str:
+    # "h1,h2" with ports ",5433" -> "5432,5433". Ports are positional; a lone
+    # PORT only reaches here when every host uses it (parse() collapses equal
+    # ports, and libpq's keyword form applies a single port to every host),
+    # so "5432,5432" -> "5432".
+    default = str(DEFAULT_PORTS.get(engine, ""))
+    ports = [part.strip() or default for part in str(port or "").split(",")]
+    if len(set(ports)) == 1:
+        return ports[0]
+    return ",".join(ports)
+
+
+def _is_private(config: Mapping[str, Any]) -> bool:
+    # Every connection to these gets its own database.
+    name = str(config.get("NAME") or "")
+    return name == ":memory:" or ("mode=memory" in name and "cache=shared" not in name)
+
+
+def _flatten(options: Mapping[str, Any], prefix: str = "") -> Iterator[tuple[str, str]]:
+    for key, value in options.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, Mapping):
+            yield from _flatten(cast(Mapping[str, Any], value), f"{name}.")
+        elif isinstance(value, (list, tuple)):
+            for item in cast(list[object], value):
+                yield name, _canonical_value(item)
+        else:
+            yield name, _canonical_value(value)
+
+
+def _canonical_value(value: object) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True, default=str)
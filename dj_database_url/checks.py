@@ -0,0 +1,220 @@
+"""Checks for database settings that work but hurt throughput.
+
+Add ``"dj_database_url"`` to ``INSTALLED_APPS`` to run them with Django's
+system checks, or run them over URLs with ``python -m dj_database_url check``.
+The connection budget check needs the deployment's concurrency, e.g.::
+
+    DATABASE_CONNECTION_BUDGET = {"workers": 4, "threads": 8, "max_connections": 100}
+
+The check for ``CONN_MAX_AGE=0`` is opt-in, as it is Django's default::
+
+    DATABASE_CHECK_CONN_MAX_AGE = True
+"""
+
+import importlib.util
+import ipaddress
+import urllib.parse as urlparse
+from collections.abc import Iterator, Mapping
+from typing import Any, NamedTuple, cast
+
+from django.core import checks
+
+from dj_database_url.canonical import DEFAULT_PORTS
+from dj_database_url.lazy import LazyDatabases
+
+TAG = "dj_database_url"
+# Connections a psycopg pool keeps open when the URL does not size it
+DEFAULT_POOL_SIZE = 4
+
+_LOCAL_HOSTS = ("", "localhost")
+_SSL_MODES = ("require", "verify-ca", "verify-full")
+
+
+class Problem(NamedTuple):
+    id: str
+    alias: str
+    msg: str
+    hint: str
+
+
+def check_databases(
+    databases: Mapping[str, Mapping[str, Any]],
+    workers: int | None = None,
+    threads: int | None = None,
+    max_connections: int | None = None,
+    check_conn_max_age: bool = False,
+) -> list[Problem]:
+    """Returns the problems of ``databases``, a ``DATABASES`` setting.
+
+    The connection budget is only checked when ``workers``, ``threads`` and
+    ``max_connections`` are all given, and ``CONN_MAX_AGE=0`` (W001) only
+    with ``check_conn_max_age``. Aliases of a ``LazyDatabases`` that are not
+    parsed yet are skipped rather than parsed.
+    """
+    problems: list[Problem] = []
+    configs = dict(_parsed_configs(databases))
+    for alias, config in configs.items():
+        problems.extend(_check_config(alias, config, check_conn_max_age))
+    if workers and threads and max_connections:
+        problems.extend(_check_budget(configs, workers, threads, max_connections))
+    return problems
+
+
+def _parsed_configs(
+    databases: Mapping[str, Mapping[str, Any]],
+) -> Iterator[tuple[str, Mapping[str, Any]]]:
+    for alias, config in databases.items():
+        if isinstance(databases, LazyDatabases) and not databases.is_parsed(alias):
+            continue
+        yield alias, config
+
+
+def check_database_settings(
+    app_configs: object = None, **kwargs: Any
+) -> list[checks.CheckMessage]:
+    """Django system check running ``check_databases()`` on ``DATABASES``."""
+    from django.conf import settings
+
+    budget: Mapping[str, int] = getattr(settings, "DATABASE_CONNECTION_BUDGET", {})
+    problems = check_databases(
+        settings.DATABASES,
+        workers=budget.get("workers"),
+        threads=budget.get("threads"),
+        max_connections=budget.get("max_connections"),
+        check_conn_max_age=getattr(settings, "DATABASE_CHECK_CONN_MAX_AGE", False),
+    )
+    return [
+        checks.Warning(problem.msg, hint=problem.hint, obj=problem.alias, id=problem.id)
+        for problem in problems
+    ]
+
+
+def _check_config(
+    alias: str, config: Mapping[str, Any], check_conn_max_age: bool
+) -> Iterator[Problem]:
+    engine = _engine(config)
+    options: Mapping[str, Any] = config.get("OPTIONS") or {}
+    conn_max_age = config.get("CONN_MAX_AGE", 0)
+    pool = options.get("pool")
+
+    # PgBouncer pools the server connections, and ?pgbouncer=session sets
+    # CONN_MAX_AGE=0 on purpose.
+    if (
+        check_conn_max_age
+        and conn_max_age == 0
+        and not pool
+        and not config.get("PGBOUNCER")
+        and not _is_sqlite(engine)
+    ):
+        yield Problem(
+            "dj_database_url.W001",
+            alias,
+            "CONN_MAX_AGE is 0, so every request opens a new database connection.",
+            "Keep connections open with conn_max_age (e.g. 600) and"
+            " conn_health_checks=True, or use a connection pool (?pool=true).",
+        )
+    if conn_max_age is None and not config.get("CONN_HEALTH_CHECKS"):
+        yield Problem(
+            "dj_database_url.W002",
+            alias,
+            "CONN_MAX_AGE is None but CONN_HEALTH_CHECKS is off, so connections"
+            " broken by a server restart or failover are only noticed by the"
+            " queries that fail on them.",
+            "Pass conn_health_checks=True.",
+        )
+    host = str(config.get("HOST") or "")
+    if options.get("sslmode") in _SSL_MODES and _is_local(host):
+        yield Problem(
+            "dj_database_url.W003",
+            alias,
+            f"sslmode={options['sslmode']} for the local host {host!r} pays for"
+            " TLS without protecting anything (and is ignored on Unix sockets).",
+            "Drop sslmode (or ssl_require) for loopback and Unix socket hosts.",
+        )
+    # parse() already refuses this combination; W004 is for configs changed
+    # or written by hand.
+    if pool and conn_max_age != 0:
+        yield Problem(
+            "dj_database_url.W004",
+            alias,
+            f"Connection pooling is combined with CONN_MAX_AGE={conn_max_age!r};"
+            " Django refuses to connect with both.",
+            "Use conn_max_age=0 with ?pool=true, the pool keeps connections open.",
+        )
+    if config.get("DRIVER") == "psycopg2" and importlib.util.find_spec("psycopg"):
+        yield Problem(
+            "dj_database_url.W005",
+            alias,
+            "The URL asks for psycopg2, but Django uses psycopg because it is"
+            " installed.",
+            "Use a postgres+psycopg:// URL, or uninstall psycopg.",
+        )
+
+
+def _check_budget(
+    databases: Mapping[str, Mapping[str, Any]],
+    workers: int,
+    threads: int,
+    max_connections: int,
+) -> Iterator[Problem]:
+    # A process opens up to one connection per thread and alias, or the pool
+    # size when pooling; aliases on the same server add up.
+    aliases: dict[str, list[str]] = {}
+    connections: dict[str, int] = {}
+    for alias, config in databases.items():
+        engine = _engine(config)
+        if _is_sqlite(engine):
+            continue
+        host = str(config.get("HOST") or "localhost")
+        port = config.get("PORT") or DEFAULT_PORTS.get(engine)
+        server = f"{host}:{port}" if port else host
+        aliases.setdefault(server, []).append(alias)
+        connections[server] = connections.get(server, 0) + _connections_per_process(
+            config, threads
+        )
+    for server, server_aliases in aliases.items():
+        total = workers * connections[server]
+        if total > max_connections:
+            yield Problem(
+                "dj_database_url.W006",
+                server_aliases[0],
+                f"{workers} workers can open {total} connections to {server}"
+                f" (aliases: {', '.join(server_aliases)}), more than its"
+                f" max_connections of {max_connections}.",
+                "Use fewer workers or threads, point duplicate aliases at one"
+                " alias, or size a connection pool (?pool_max_size=...).",
+            )
+
+
+def _connections_per_process(config: Mapping[str, Any], threads: int) -> int:
+    options: Mapping[str, Any] = config.get("OPTIONS") or {}
+    pool = options.get("pool")
+    if not pool:
+        return threads
+    if isinstance(pool, Mapping):
+        pool_options = cast(Mapping[str, Any], pool)
+        min_size = pool_options.get("min_size", DEFAULT_POOL_SIZE)
+        return int(pool_options.get("max_size") or min_size)
+    return DEFAULT_POOL_SIZE
+
+
+def _engine(config: Mapping[str, Any]) -> str:
+    return str(config.get("WRAPPED_ENGINE") or config.get("ENGINE") or "")
+
+
+def _is_sqlite(engine: str) -> bool:
+    return engine.endswith(("sqlite3", "spatialite"))
+
+
+def _is_local(host: str) -> bool:
+    # Every host of a "host1,host2" list must be local.
+    for name in urlparse.unquote(host).split(","):
+        name = name.strip().lower()
+        if name in _LOCAL_HOSTS or name.startswith("/"):
+            continue
+        try:
+            if not ipaddress.ip_address(name.strip("[]")).is_loopback:
+                return False
+        except ValueError:
+            return False
+    return True
@@ -0,0 +1,182 @@
+"""Connection metrics for databases parsed with ``instrument=True``.
+
+Every connection opened through an instrumented alias reports how long it took
+to connect, how long it stayed open and how many queries it ran to
+``COLLECTOR``, which keeps per-alias histograms and forwards each measurement
+to the registered exporters.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from django.db.backends.base.base import BaseDatabaseWrapper as _WrapperBase
+else:
+    _WrapperBase = object
+
+# Seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+LIFETIME_BUCKETS = (0.1, 1, 10, 60, 300, 600, 1800, 3600)
+# Queries
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# (metric, alias, value), e.g. ("connect_latency", "default", 0.012)
+Exporter = Callable[[str, str, float], None]
+
+
+class Histogram:
+    """Counts observations per bucket.
+
+    Counts are not cumulative: ``counts[i]`` is the number of values up to
+    ``buckets[i]`` and above the previous bound. The last count holds the
+    values above every bound.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+            "count": self.count,
+            "sum": self.sum,
+        }
+
+
+class AliasStats:
+    def __init__(self) -> None:
+        self.opened = 0
+        self.closed = 0
+        self.queries = 0
+        self.connect_latency = Histogram(LATENCY_BUCKETS)
+        self.lifetime = Histogram(LIFETIME_BUCKETS)
+        self.queries_per_connection = Histogram(QUERY_BUCKETS)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "opened": self.opened,
+            "closed": self.closed,
+            "queries": self.queries,
+            "connect_latency": self.connect_latency.as_dict(),
+            "lifetime": self.lifetime.as_dict(),
+            "queries_per_connection": self.queries_per_connection.as_dict(),
+        }
+
+
+class Collector:
+    """Thread-safe, in-process store of connection metrics per alias."""
+
+    def __init__(self) -> None:
+        self._stats: dict[str, AliasStats] = {}
+        self._exporters: list[Exporter] = []
+        self._lock = threading.Lock()
+
+    def add_exporter(self, exporter: Exporter) -> None:
+        with self._lock:
+            self._exporters.append(exporter)
+
+    def remove_exporter(self, exporter: Exporter) -> None:
+        with self._lock:
+            self._exporters.remove(exporter)
+
+    def record_connect(self, alias: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._alias_stats(alias)
+            stats.opened += 1
+            stats.connect_latency.observe(seconds)
+        self._export("connect_latency", alias, seconds)
+
+    def record_close(self, alias: str, lifetime: float, queries: int) -> None:
+        with self._lock:
+            stats = self._alias_stats(alias)
+            stats.closed += 1
+            stats.queries += queries
+            stats.lifetime.observe(lifetime)
+            stats.queries_per_connection.observe(queries)
+        self._export("connection_lifetime", alias, lifetime)
+        self._export("connection_queries", alias, queries)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Returns the metrics of every alias as plain dictionaries."""
+        with self._lock:
+            return {alias: stats.as_dict() for alias, stats in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def _alias_stats(self, alias: str) -> AliasStats:
+        if alias not in self._stats:
+            self._stats[alias] = AliasStats()
+        return self._stats[alias]
+
+    def _export(self, metric: str, alias: str, value: float) -> None:
+        for exporter in list(self._exporters):
+            try:
+                exporter(metric, alias, value)
+            except Exception:
+                # Metrics must never break a database connection.
+                logging.exception("Exporting %s for %s failed", metric, alias)
+
+
+COLLECTOR = Collector()
+
+
+def logging_exporter(metric: str, alias: str, value: float) -> None:
+    logging.info("%s[%s]=%s", metric, alias, value)
+
+
+class InstrumentedDatabaseWrapperMixin(_WrapperBase):
+    """Reports connects, closes and query counts to ``COLLECTOR``."""
+
+    connection: Any
+    execute_wrappers: list[Any]
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._opened_at = 0.0
+        self._queries = 0
+        # Installed first so that execute_wrapper() blocks pop their own.
+        self.execute_wrappers.append(self._count_query)
+
+    def connect(self) -> None:
+        start = time.perf_counter()
+        super().connect()
+        COLLECTOR.record_connect(self.alias, time.perf_counter() - start)
+        self._opened_at = time.monotonic()
+        self._queries = 0
+
+    def close(self) -> None:
+        was_open = self.connection is not None
+        try:
+            super().close()
+        finally:
+            # close() keeps the connection inside an atomic block.
+            if was_open and self.connection is None:
+                COLLECTOR.record_close(
+                    self.alias, time.monotonic() - self._opened_at, self._queries
+                )
+
+    def _count_query(
+        self,
+        execute: Callable[..., Any],
+        sql: Any,
+        params: Any,
+        many: bool,
+        context: dict[str, Any],
+    ) -> Any:
+        self._queries += 1
+        return execute(sql, params, many, context)
@@ -0,0 +1,280 @@
+"""A ``DATABASES`` mapping that parses each URL on first access.
+
+Useful with many databases (e.g. one per tenant) of which a process only talks
+to a few: startup only indexes the aliases, and unused configs never exist.
+"""
+
+import math
+import threading
+import time
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping
+from typing import Any, cast
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.utils import ConnectionHandler
+
+import dj_database_url
+
+# An alias points at its URL, or at the offset of its line in a file.
+_Source = str | int
+
+
+class LazyDatabases(Mapping[str, dict[str, Any]]):
+    """Maps aliases to database configs, parsing each URL when first used.
+
+    ``urls`` maps aliases to URLs, or is an iterable of ``(alias, url)``
+    pairs; it is read on first use. Each config is built by ``parse()`` with
+    the ``parse_options`` keyword arguments and completed with Django's
+    defaults, so it can be used as ``settings.DATABASES``. With
+    ``idle_timeout``, configs not accessed for that many seconds are dropped
+    and parsed again when needed; open connections keep theirs.
+    """
+
+    def __init__(
+        self,
+        urls: Mapping[str, str] | Iterable[tuple[str, str]] = (),
+        parse_options: dict[str, Any] | None = None,
+        idle_timeout: float | None = None,
+    ):
+        self._urls = urls
+        self._path: str | None = None
+        self._url_references: dict[str, str] = {}
+        self.parse_options = parse_options or {}
+        self.idle_timeout = idle_timeout
+        self._index: dict[str, tuple[str | None, _Source]] | None = None
+        self._configs: dict[str, dict[str, Any]] = {}
+        self._last_used: dict[str, float] = {}
+        self._last_eviction = -math.inf
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str,
+        parse_options: dict[str, Any] | None = None,
+        idle_timeout: float | None = None,
+    ) -> "LazyDatabases":
+        """Reads ``alias=url`` lines from ``path``.
+
+        Blank lines and lines starting with ``#`` are skipped. Only the
+        position of each line is kept; URLs are read again when parsed.
+        """
+        databases = cls(parse_options=parse_options, idle_timeout=idle_timeout)
+        databases._path = path
+        return databases
+
+    @classmethod
+    def from_env(
+        cls,
+        env: str = dj_database_url.DEFAULT_ENV,
+        parse_options: dict[str, Any] | None = None,
+        idle_timeout: float | None = None,
+    ) -> "LazyDatabases":
+        """Reads the URLs of the environment like ``config_all()``: ``env`` for
+        the default alias, ``<env>_<ALIAS>`` for the others, ``<env>S`` and
+        the ``*_FILE`` variables."""
+        urls, url_references = dj_database_url.environment_urls(env)
+        databases = cls(urls, parse_options, idle_timeout)
+        databases._url_references = url_references
+        return databases
+
+    def __getitem__(self, alias: str) -> dict[str, Any]:
+        with self._lock:
+            config = self._configs.get(alias)
+            if config is None:
+                index = self._load_index()
+                if alias not in index:
+                    raise KeyError(alias)
+                config = self._parse(index[alias][1])
+                # Credential rotation re-reads the whole URL from its file.
+                if alias in self._url_references and (
+                    dj_database_url.ROTATION_MIXIN in config.get("ENGINE_MIXINS", ())
+                ):
+                    config["URL_REFERENCE"] = self._url_references[alias]
+                self._configs[alias] = config
+            self._last_used[alias] = time.monotonic()
+            self._evict_idle()
+            return config
+
+    def __contains__(self, alias: object) -> bool:
+        return alias in self._load_index()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load_index())
+
+    def __len__(self) -> int:
+        return len(self._load_index())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        mapping = cast(Mapping[object, object], other)
+        # ConnectionHandler compares DATABASES with {}: avoid parsing for that.
+        if len(mapping) != len(self):
+            return False
+        return dict(self.items()) == dict(mapping.items())
+
+    def values(self) -> "_LazyValuesView":  # type: ignore[override]
+        return _LazyValuesView(self)
+
+    def items(self) -> "_LazyItemsView":  # type: ignore[override]
+        return _LazyItemsView(self)
+
+    def is_parsed(self, alias: str) -> bool:
+        return alias in self._configs
+
+    def evict(self, alias: str | None = None) -> None:
+        """Drops the config of ``alias``, or of every alias."""
+        with self._lock:
+            if alias is None:
+                self._configs.clear()
+                self._last_used.clear()
+            else:
+                self._configs.pop(alias, None)
+                self._last_used.pop(alias, None)
+
+    def engine(self, alias: str) -> str:
+        """Returns the ``ENGINE`` of ``alias``, without parsing it if possible."""
+        if alias in self._configs:
+            return self._configs[alias]["ENGINE"]
+        engine = self._load_index()[alias][0]
+        return engine if engine is not None else self[alias]["ENGINE"]
+
+    def _evict_idle(self) -> None:
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        if now - self._last_eviction < self.idle_timeout / 2:
+            return
+        self._last_eviction = now
+        for alias, last_used in list(self._last_used.items()):
+            if now - last_used > self.idle_timeout:
+                self.evict(alias)
+
+    def _load_index(self) -> dict[str, tuple[str | None, _Source]]:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self._build_index()
+        return self._index
+
+    def _build_index(self) -> dict[str, tuple[str | None, _Source]]:
+        index: dict[str, tuple[str | None, _Source]] = {}
+        if self._path is not None:
+            with open(self._path, "rb") as f:
+                offset = 0
+                for raw_line in f:
+                    alias, url = self._split_line(raw_line.decode())
+                    if alias:
+                        index[alias] = (self._engine_hint(url), offset)
+                    offset += len(raw_line)
+            return index
+
+        urls = self._urls
+        pairs = urls.items() if isinstance(urls, Mapping) else urls
+        for alias, url in pairs:
+            index[alias] = (self._engine_hint(url), url)
+        self._urls = ()
+        return index
+
+    @staticmethod
+    def _split_line(line: str) -> tuple[str, str]:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            return "", ""
+        alias, separator, url = line.partition("=")
+        if not separator or not alias:
+            raise ValueError(f"Expected alias=url lines, got {line!r}.")
+        return alias.strip(), url.strip()
+
+    def _engine_hint(self, url: str) -> str | None:
+        # The ENGINE that parse() will return, when it is obvious from the
+        # scheme alone.
+        if self.parse_options.get("engine"):
+            return self.parse_options["engine"]
+        scheme, _, rest = url.partition("://")
+        engine = dj_database_url.get_engine(scheme)
+        if engine is None or "instrument" in rest or "rotate_credentials" in rest:
+            return None
+        if self.parse_options.get("instrument") or self.parse_options.get(
+            "rotate_credentials"
+        ):
+            return dj_database_url.WRAPPER_ENGINE
+        return engine.backend
+
+    def _parse(self, source: _Source) -> dict[str, Any]:
+        if isinstance(source, int):
+            assert self._path is not None
+            with open(self._path, "rb") as f:
+                f.seek(source)
+                source = self._split_line(f.readline().decode())[1]
+        config = cast(
+            dict[str, Any], dj_database_url.parse(source, **self.parse_options)
+        )
+        # Fill in Django's defaults, as ConnectionHandler would have done.
+        ConnectionHandler().configure_settings({DEFAULT_DB_ALIAS: config})  # pyright: ignore[reportUnknownMemberType]
+        return config
+
+
+class LazyConfig(MutableMapping[str, Any]):
+    """A database config that is only parsed when read.
+
+    ``setdefault()`` on an unparsed config is a no-op returning the default,
+    since Django's defaults are applied when it is parsed, and ``ENGINE`` is
+    answered from the URL scheme when possible. This lets
+    ``ConnectionHandler.configure_settings()`` walk every database without
+    parsing them.
+    """
+
+    def __init__(self, databases: LazyDatabases, alias: str):
+        self.databases = databases
+        self.alias = alias
+
+    def _config(self) -> dict[str, Any]:
+        return self.databases[self.alias]
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "ENGINE":
+            return self.databases.engine(self.alias)
+        return self._config()[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._config()[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._config()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._config())
+
+    def __len__(self) -> int:
+        return len(self._config())
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if self.databases.is_parsed(self.alias):
+            return self._config().setdefault(key, default)
+        return default
+
+
+class _LazyValuesView(Iterable[LazyConfig]):
+    def __init__(self, databases: LazyDatabases):
+        self._databases = databases
+
+    def __len__(self) -> int:
+        return len(self._databases)
+
+    def __iter__(self) -> Iterator[LazyConfig]:
+        for alias in self._databases:
+            yield LazyConfig(self._databases, alias)
+
+
+class _LazyItemsView(Iterable[tuple[str, LazyConfig]]):
+    def __init__(self, databases: LazyDatabases):
+        self._databases = databases
+
+    def __len__(self) -> int:
+        return len(self._databases)
+
+    def __iter__(self) -> Iterator[tuple[str, LazyConfig]]:
+        for alias in self._databases:
+            yield alias, LazyConfig(self._databases, alias)
@@ -0,0 +1,167 @@
+"""Secret references for database passwords.
+
+With ``resolve_secrets=True``, a password of the form
+``<resolver>:<reference>``, where ``<resolver>`` is a registered name, is
+replaced with the value the resolver returns, e.g.
+``file:/run/secrets/db_password`` or ``env:DB_PASSWORD``. Resolved values are
+kept in ``SECRET_CACHE`` for the resolver's TTL.
+"""
+
+import inspect
+import os
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, NamedTuple, TypeVar
+
+DEFAULT_SECRET_TTL = 300.0
+
+Resolver = Callable[[str], str] | Callable[[str], Awaitable[str]]
+R = TypeVar("R", bound=Resolver)
+
+
+class SecretResolutionError(ValueError):
+    def __init__(self, reference: str, reason: str):
+        self.reference = reference
+        self.reason = reason
+
+    def __str__(self) -> str:
+        return f"Could not resolve secret '{self.reference}': {self.reason}."
+
+
+class ResolverEntry(NamedTuple):
+    resolver: Callable[[str], Any]
+    ttl: float
+    is_async: bool
+
+
+RESOLVERS: dict[str, ResolverEntry] = {}
+
+
+class SecretCache:
+    """Resolved secrets by reference, each kept for its resolver's TTL."""
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, reference: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(reference)
+            if entry is None:
+                return None
+            value, expires = entry
+            if time.monotonic() >= expires:
+                del self._entries[reference]
+                return None
+            return value
+
+    def put(self, reference: str, value: str, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[reference] = (value, time.monotonic() + ttl)
+
+    def discard(self, reference: str) -> None:
+        with self._lock:
+            self._entries.pop(reference, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+SECRET_CACHE = SecretCache()
+
+# Modification times of the files behind file: references, see refresh_secret()
+_file_mtimes: dict[str, int | None] = {}
+
+
+def register_resolver(name: str, ttl: float = DEFAULT_SECRET_TTL) -> Callable[[R], R]:
+    """Registers a sync or async resolver for ``<name>:<reference>`` values.
+
+    The resolver receives the reference and returns the secret. A ``ttl`` of
+    0 disables caching.
+    """
+
+    def inner(func: R) -> R:
+        RESOLVERS[name] = ResolverEntry(
+            func,
+            ttl,
+            inspect.iscoroutinefunction(func),  # pyright: ignore[reportDeprecated]
+        )
+        SECRET_CACHE.clear()
+        return func
+
+    return inner
+
+
+def split_reference(value: str) -> tuple[str, str] | None:
+    """Returns ``(resolver name, reference)``, or None for a plain value."""
+    name, separator, reference = value.partition(":")
+    if separator and reference and name in RESOLVERS:
+        return name, reference
+    return None
+
+
+def resolve_secret(value: str) -> str:
+    """Resolves a secret reference; plain values are returned unchanged."""
+    split = split_reference(value)
+    if split is None:
+        return value
+    cached = SECRET_CACHE.get(value)
+    if cached is not None:
+        return cached
+
+    name, reference = split
+    entry = RESOLVERS[name]
+    result: object
+    try:
+        if entry.is_async:
+            # Imported here as it pulls in asyncio, which only async
+            # resolvers need.
+            from asgiref.sync import async_to_sync
+
+            result = async_to_sync(entry.resolver)(reference)
+        else:
+            result = entry.resolver(reference)
+    except SecretResolutionError:
+        raise
+    except Exception as exc:
+        raise SecretResolutionError(value, str(exc) or type(exc).__name__) from exc
+    if not isinstance(result, str):
+        raise SecretResolutionError(value, "resolver did not return a string")
+    SECRET_CACHE.put(value, result, entry.ttl)
+    return result
+
+
+def refresh_secret(value: str) -> str:
+    """Like resolve_secret(), but re-reads a file secret as soon as it changes.
+
+    Other references are re-resolved once their cached value expires.
+    """
+    split = split_reference(value)
+    if split is not None and split[0] == "file":
+        try:
+            mtime: int | None = os.stat(split[1]).st_mtime_ns
+        except OSError:
+            mtime = None
+        if value not in _file_mtimes or _file_mtimes[value] != mtime:
+            SECRET_CACHE.discard(value)
+        _file_mtimes[value] = mtime
+    return resolve_secret(value)
+
+
+@register_resolver("file")
+def read_secret_file(path: str) -> str:
+    # Secret files usually end with a newline that is not part of the secret.
+    with open(path, encoding="utf-8") as f:
+        return f.read().rstrip("\r\n")
+
+
+@register_resolver("env", ttl=0)
+def read_environment(name: str) -> str:
+    try:
+        return os.environ[name]
+    except KeyError:
+        raise SecretResolutionError(f"env:{name}", "variable is not set") from None
@@ -0,0 +1,53 @@
+"""Picks up rotated database credentials without restarting the process.
+
+Databases parsed with ``rotate_credentials=True`` re-resolve their password
+reference (``PASSWORD_REFERENCE``), or re-read the URL file they were
+configured from (``URL_REFERENCE``), each time Django opens a new connection.
+Connections that are already open keep running until ``CONN_MAX_AGE`` or an
+error closes them.
+"""
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+import dj_database_url
+from dj_database_url.resolvers import refresh_secret
+
+if TYPE_CHECKING:
+    from django.db.backends.base.base import BaseDatabaseWrapper as _WrapperBase
+else:
+    _WrapperBase = object
+
+
+def refresh_credentials(settings_dict: dict[str, Any]) -> None:
+    """Updates ``USER`` and ``PASSWORD`` from their original source.
+
+    File secrets are re-read when their modification time changes, other
+    resolvers when their TTL expires. If the source cannot be read, the
+    current credentials are kept.
+    """
+    try:
+        url_reference = settings_dict.get("URL_REFERENCE")
+        if url_reference:
+            # A password reference means the URL's secrets were resolved.
+            parsed_config = dj_database_url.parse(
+                refresh_secret(url_reference),
+                resolve_secrets="PASSWORD_REFERENCE" in settings_dict,
+            )
+            settings_dict["USER"] = parsed_config.get("USER", "")
+            settings_dict["PASSWORD"] = parsed_config.get("PASSWORD", "")
+        password_reference = settings_dict.get("PASSWORD_REFERENCE")
+        if password_reference:
+            settings_dict["PASSWORD"] = refresh_secret(password_reference)
+    except ValueError as exc:
+        logging.warning("Keeping the current database credentials: %s", exc)
+
+
+class CredentialRotationMixin(_WrapperBase):
+    """Refreshes the credentials before every new connection."""
+
+    settings_dict: dict[str, Any]
+
+    def connect(self) -> None:
+        refresh_credentials(self.settings_dict)
+        super().connect()
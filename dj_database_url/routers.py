@@ -0,0 +1,188 @@
+import itertools
+import math
+import threading
+import time
+from collections.abc import Callable, Generator, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import reduce
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from dj_database_url.lazy import LazyDatabases
+
+# Monotonic deadline until which reads stick to the primary; None outside a
+# sticky_scope(). Context variables are per thread under WSGI and per task
+# under ASGI.
+_pinned_until: ContextVar[float | None] = ContextVar(
+    "dj_database_url_pinned_until", default=None
+)
+
+
+def replica_weights(
+    databases: Mapping[str, Mapping[str, Any]], primary: str = DEFAULT_DB_ALIAS
+) -> dict[str, int]:
+    """Returns the aliases that mirror ``primary``, mapped to their weights.
+
+    Aliases of a ``LazyDatabases`` that are not parsed yet are skipped rather
+    than parsed.
+    """
+    weights: dict[str, int] = {}
+    for alias, config in databases.items():
+        if isinstance(databases, LazyDatabases) and not databases.is_parsed(alias):
+            continue
+        test_settings: Mapping[str, Any] = config.get("TEST") or {}
+        if alias != primary and test_settings.get("MIRROR") == primary:
+            weights[alias] = config.get("REPLICA_WEIGHT", 1)
+    return weights
+
+
+def weighted_schedule(weights: Mapping[str, int]) -> list[str]:
+    """Returns one cycle of a smooth weighted round-robin over ``weights``.
+
+    Equal weights give plain round-robin; e.g. ``{"a": 2, "b": 1}`` gives
+    ``["a", "b", "a"]``.
+    """
+    if not weights:
+        return []
+    divisor = reduce(math.gcd, weights.values())
+    weights = {alias: weight // divisor for alias, weight in weights.items()}
+    total = sum(weights.values())
+    current = dict.fromkeys(weights, 0)
+    schedule: list[str] = []
+    for _ in range(total):
+        for alias, weight in weights.items():
+            current[alias] += weight
+        chosen = max(current, key=lambda alias: current[alias])
+        current[chosen] -= total
+        schedule.append(chosen)
+    return schedule
+
+
+class ReplicaRouter:
+    """Sends writes to the primary and spreads reads across its replicas.
+
+    Replicas are the aliases whose ``TEST["MIRROR"]`` points at the primary,
+    as generated by ``dj_database_url.parse_replicas()``; their
+    ``REPLICA_WEIGHT`` decides how many reads each one receives. Without any
+    replica, reads go to the primary as well.
+
+    ``databases`` defaults to ``settings.DATABASES``. Unparsed aliases of a
+    ``LazyDatabases`` are not considered, so with lazy ``DATABASES`` pass the
+    replicas explicitly, e.g. a ``parse_replicas()`` result.
+    """
+
+    primary = DEFAULT_DB_ALIAS
+
+    def __init__(self, databases: Mapping[str, Mapping[str, Any]] | None = None):
+        self.replicas = replica_weights(
+            settings.DATABASES if databases is None else databases, self.primary
+        )
+        self._schedule: Iterator[str] = itertools.cycle(
+            weighted_schedule(self.replicas) or [self.primary]
+        )
+        self._lock = threading.Lock()
+
+    def db_for_read(self, model: Any, **hints: Any) -> str:
+        with self._lock:
+            return next(self._schedule)
+
+    def db_for_write(self, model: Any, **hints: Any) -> str:
+        return self.primary
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> bool | None:
+        pool = {self.primary, *self.replicas}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(
+        self, db: str, app_label: str, model_name: str | None = None, **hints: Any
+    ) -> bool | None:
+        if db in self.replicas:
+            return False
+        return None
+
+
+def pin_to_primary(seconds: float | None = None) -> None:
+    """Sends reads to the primary for ``seconds``, or until the current
+    ``sticky_scope()`` ends if ``seconds`` is None.
+
+    Outside a ``sticky_scope()`` only a pin for ``seconds`` is taken: threads
+    of WSGI servers and task queues are reused, so a pin without an end would
+    keep them off the replicas for good.
+    """
+    current = _pinned_until.get()
+    if seconds is None:
+        if current is None:
+            return
+        deadline = math.inf
+    else:
+        deadline = time.monotonic() + seconds
+    if current is None or deadline > current:
+        _pinned_until.set(deadline)
+
+
+def is_pinned_to_primary() -> bool:
+    deadline = _pinned_until.get()
+    return deadline is not None and time.monotonic() < deadline
+
+
+@contextmanager
+def sticky_scope() -> Generator[None, None, None]:
+    """Starts with reads unpinned and forgets any pin on exit.
+
+    Wrap each request or background task in it; it also works as a decorator.
+    """
+    token = _pinned_until.set(-math.inf)
+    try:
+        yield
+    finally:
+        _pinned_until.reset(token)
+
+
+class StickyReplicaRouter(ReplicaRouter):
+    """A ReplicaRouter that reads from the primary after a write.
+
+    Once a write has been routed, reads go to the primary for the rest of the
+    current ``sticky_scope()`` (see ``sticky_primary_middleware``), or for
+    ``sticky_window`` seconds if set, so a request reads its own writes even
+    while the replicas lag behind.
+    """
+
+    sticky_window: float | None = None
+
+    def db_for_read(self, model: Any, **hints: Any) -> str:
+        if is_pinned_to_primary():
+            return self.primary
+        return super().db_for_read(model, **hints)
+
+    def db_for_write(self, model: Any, **hints: Any) -> str:
+        pin_to_primary(self.sticky_window)
+        return super().db_for_write(model, **hints)
+
+
+class StickyPrimaryMiddleware:
+    """Runs every request in its own ``sticky_scope()``, under WSGI and ASGI."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[Any], Any]):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)  # pyright: ignore[reportDeprecated]
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: Any) -> Any:
+        if self.is_async:
+            return self.__acall__(request)
+        with sticky_scope():
+            return self.get_response(request)
+
+    async def __acall__(self, request: Any) -> Any:
+        with sticky_scope():
+            return await self.get_response(request)
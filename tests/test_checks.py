@@ -0,0 +1,237 @@
+# pyright: reportTypedDictNotRequiredAccess=false
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from typing import Any
+from unittest import mock
+
+import django
+from django import conf
+from django.core import checks
+
+import dj_database_url
+from dj_database_url.__main__ import main
+from dj_database_url.apps import DjDatabaseUrlConfig
+from dj_database_url.checks import check_database_settings, check_databases
+from dj_database_url.lazy import LazyDatabases
+
+
+def setUpModule() -> None:
+    if not conf.settings.configured:
+        conf.settings.configure()
+        django.setup()
+
+
+def ids(databases: dict[str, Any], **kwargs: Any) -> list[tuple[str, str]]:
+    return [
+        (problem.alias, problem.id.rpartition(".")[2])
+        for problem in check_databases(databases, **kwargs)
+    ]
+
+
+class CheckDatabasesTestSuite(unittest.TestCase):
+    def test_good_config(self) -> None:
+        databases = {
+            "default": dj_database_url.parse(
+                "postgres://db/app?sslmode=require",
+                conn_max_age=600,
+                conn_health_checks=True,
+            ),
+            "pooled": dj_database_url.parse("postgres://db/app?pool=true"),
+            "sqlite": dj_database_url.parse("sqlite:///db.sqlite3"),
+        }
+        assert ids(databases) == []
+
+    def test_conn_max_age(self) -> None:
+        databases = {
+            "zero": dj_database_url.parse("postgres://db/app"),
+            "unchecked": dj_database_url.parse("postgres://db/app", conn_max_age=None),
+            "checked": dj_database_url.parse(
+                "postgres://db/app", conn_max_age=None, conn_health_checks=True
+            ),
+            "default": {"ENGINE": "django.db.backends.mysql", "NAME": "app"},
+            "pgbouncer": dj_database_url.parse("postgres://db/app?pgbouncer=session"),
+        }
+        assert ids(databases, check_conn_max_age=True) == [
+            ("zero", "W001"),
+            ("unchecked", "W002"),
+            ("default", "W001"),
+        ]
+        assert ids(databases) == [("unchecked", "W002")]
+
+    def test_ssl_to_local_host(self) -> None:
+        hosts = {
+            "localhost": True,
+            "": True,
+            "%2Fvar%2Frun%2Fpostgresql": True,
+            "127.0.0.1": True,
+            "[::1]": True,
+            "localhost,127.0.0.2": True,
+            "localhost,db": False,
+            "db.example.com": False,
+            "10.0.0.1": False,
+        }
+        for host, local in hosts.items():
+            with self.subTest(host=host):
+                config = dj_database_url.parse(
+                    f"postgres://{host}/app", conn_max_age=600, ssl_require=True
+                )
+                expected = [("default", "W003")] if local else []
+                assert ids({"default": config}) == expected
+
+    def test_pool_with_persistent_connections(self) -> None:
+        config = dj_database_url.parse("postgres://db/app?pool=true")
+        config["CONN_MAX_AGE"] = 600
+        assert ids({"default": config}) == [("default", "W004")]
+
+    def test_psycopg2_driver(self) -> None:
+        config = dj_database_url.parse("postgres+psycopg2://db/app", conn_max_age=600)
+        with mock.patch("importlib.util.find_spec", return_value=object()):
+            assert ids({"default": config}) == [("default", "W005")]
+        with mock.patch("importlib.util.find_spec", return_value=None):
+            assert ids({"default": config}) == []
+
+    def test_connection_budget(self) -> None:
+        databases = {
+            "default": dj_database_url.parse("postgres://db/app", conn_max_age=600),
+            "reporting": dj_database_url.parse(
+                "postgres://db:5432/app", conn_max_age=600
+            ),
+            "pooled": dj_database_url.parse(
+                "postgres://db/other?pool=true&pool_min_size=2&pool_max_size=10"
+            ),
+            "replica": dj_database_url.parse(
+                "postgres://replica/app", conn_max_age=600
+            ),
+            "sqlite": dj_database_url.parse("sqlite://:memory:"),
+        }
+        # db: 4 * (8 + 8 + 10) = 104, replica: 4 * 8 = 32
+        assert ids(databases, workers=4, threads=8, max_connections=100) == [
+            ("default", "W006")
+        ]
+        assert ids(databases, workers=4, threads=8, max_connections=104) == []
+        assert ids(databases, workers=4, threads=8) == []
+        (problem,) = check_databases(
+            databases, workers=4, threads=8, max_connections=100
+        )
+        assert "104 connections to db:5432" in problem.msg
+        assert "default, reporting, pooled" in problem.msg
+
+    def test_lazy_databases_are_not_parsed(self) -> None:
+        databases = LazyDatabases(
+            {f"tenant_{i}": f"postgres://db/tenant_{i}" for i in range(50)},
+            {"conn_max_age": None},
+        )
+        databases["tenant_3"]
+        with mock.patch("dj_database_url.parse") as parse:
+            assert ids(databases) == [("tenant_3", "W002")]
+
+        parse.assert_not_called()
+        assert not databases.is_parsed("tenant_4")
+
+
+class DjangoCheckTestSuite(unittest.TestCase):
+    def test_check_database_settings(self) -> None:
+        databases = {
+            "default": dj_database_url.parse("postgres://db/app", conn_max_age=600),
+            "other": dj_database_url.parse("postgres://db/app", conn_max_age=600),
+        }
+        budget = {"workers": 2, "threads": 4, "max_connections": 10}
+        with (
+            mock.patch.object(conf.settings, "DATABASES", databases),
+            mock.patch.object(
+                conf.settings, "DATABASE_CONNECTION_BUDGET", budget, create=True
+            ),
+        ):
+            messages = check_database_settings()
+
+        assert len(messages) == 1
+        assert isinstance(messages[0], checks.Warning)
+        assert messages[0].id == "dj_database_url.W006"
+        assert messages[0].obj == "default"
+        assert messages[0].hint
+
+    def test_conn_max_age_check_is_opt_in(self) -> None:
+        databases = {"default": dj_database_url.parse("postgres://db/app")}
+        with mock.patch.object(conf.settings, "DATABASES", databases):
+            assert check_database_settings() == []
+            with mock.patch.object(
+                conf.settings, "DATABASE_CHECK_CONN_MAX_AGE", True, create=True
+            ):
+                (message,) = check_database_settings()
+
+        assert message.id == "dj_database_url.W001"
+
+    def test_app_registers_check(self) -> None:
+        app_config = DjDatabaseUrlConfig("dj_database_url", dj_database_url)
+        app_config.ready()
+
+        assert checks.registry.registry.tag_exists("dj_database_url")
+
+
+class CommandLineTestSuite(unittest.TestCase):
+    def run_main(self, *argv: str) -> tuple[int, str]:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = main(["check", *argv])
+        return status, output.getvalue()
+
+    def test_no_issues(self) -> None:
+        status, output = self.run_main(
+            "--conn-max-age", "600", "--conn-health-checks", "postgres://db/app"
+        )
+        assert status == 0
+        assert output == "Checked 1 database(s): no issues.\n"
+
+    def test_issues(self) -> None:
+        status, output = self.run_main(
+            "--conn-max-age",
+            "none",
+            "postgres://localhost/app?sslmode=require",
+            "reporting=postgres://db/app",
+            "unknown://db/app",
+        )
+        assert status == 1
+        assert "default: (dj_database_url.W002)" in output
+        assert "default: (dj_database_url.W003)" in output
+        assert "\tHINT: Drop sslmode" in output
+        assert "reporting: (dj_database_url.W002)" in output
+        assert "url2: Scheme 'unknown://' is unknown." in output
+        assert output.endswith("Checked 2 database(s): 4 issues.\n")
+
+    def test_file_and_budget(self) -> None:
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            f.write("# tenants\ndefault=postgres://db/app\n\nother=postgres://db/t\n")
+        self.addCleanup(os.unlink, f.name)
+
+        status, output = self.run_main(
+            "--file",
+            f.name,
+            "--workers",
+            "4",
+            "--threads",
+            "8",
+            "--max-connections",
+            "50",
+            "--check-conn-max-age",
+            "--ignore",
+            "W001",
+        )
+        assert status == 1
+        assert "default: (dj_database_url.W006) 4 workers can open 64" in output
+        assert "W001" not in output
+
+    @mock.patch.dict(os.environ, {"DATABASE_URL": "postgres://db/app"})
+    def test_environment(self) -> None:
+        status, output = self.run_main("--check-conn-max-age")
+        assert status == 1
+        assert "default: (dj_database_url.W001)" in output
+
+        assert self.run_main()[0] == 0
+
+
+if __name__ == "__main__":
+    unittest.main()
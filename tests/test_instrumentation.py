@@ -0,0 +1,150 @@
+import os
+import tempfile
+import unittest
+from typing import Any
+
+import django
+from django import conf
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.db.utils import ConnectionHandler
+
+import dj_database_url
+from dj_database_url.instrumentation import (
+    COLLECTOR,
+    Histogram,
+    InstrumentedDatabaseWrapperMixin,
+)
+
+
+def setUpModule() -> None:
+    if not conf.settings.configured:
+        conf.settings.configure()
+        django.setup()
+
+
+def connect(url: str, alias: str = "default", **kwargs: Any) -> Any:
+    handler = ConnectionHandler(
+        {"default": {}, alias: dj_database_url.parse(url, **kwargs)}
+    )
+    return handler[alias]
+
+
+class HistogramTestSuite(unittest.TestCase):
+    def test_observe(self) -> None:
+        histogram = Histogram((1, 10))
+        for value in (0.5, 1, 5, 50):
+            histogram.observe(value)
+
+        assert histogram.counts == [2, 1, 1]
+        assert histogram.count == 4
+        assert histogram.sum == 56.5
+
+
+class InstrumentationTestSuite(unittest.TestCase):
+    def setUp(self) -> None:
+        COLLECTOR.reset()
+        # in-memory sqlite databases are never closed
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.url = f"sqlite:///{os.path.join(tmpdir.name, 'db.sqlite3')}"
+
+    def test_parse_wraps_engine(self) -> None:
+        url = dj_database_url.parse("sqlite:///db.sqlite3", instrument=True)
+
+        assert url["ENGINE"] == "dj_database_url.backends"
+        assert url["WRAPPED_ENGINE"] == "django.db.backends.sqlite3"
+        assert url["ENGINE_MIXINS"] == [dj_database_url.INSTRUMENTATION_MIXIN]
+
+    def test_url_flag(self) -> None:
+        url = dj_database_url.parse("postgres://host/db?instrument=true")
+
+        assert url["WRAPPED_ENGINE"] == "django.db.backends.postgresql"
+        assert "OPTIONS" not in url
+
+    def test_url_flag_overrides_argument(self) -> None:
+        url = dj_database_url.parse(
+            "postgres://host/db?instrument=false", instrument=True
+        )
+
+        assert url["ENGINE"] == "django.db.backends.postgresql"
+
+    def test_invalid_url_flag(self) -> None:
+        with self.assertRaisesRegex(ValueError, "instrument"):
+            dj_database_url.parse("postgres://host/db?instrument=yes")
+
+    def test_engine_argument_is_wrapped(self) -> None:
+        url = dj_database_url.parse(
+            "postgres://host/db", engine="django_prometheus.db", instrument=True
+        )
+
+        assert url["ENGINE"] == "dj_database_url.backends"
+        assert url["WRAPPED_ENGINE"] == "django_prometheus.db"
+
+    def test_wrapper_subclasses_real_backend(self) -> None:
+        connection = connect("sqlite://:memory:", instrument=True)
+
+        assert isinstance(connection, SQLiteDatabaseWrapper)
+        assert isinstance(connection, InstrumentedDatabaseWrapperMixin)
+        assert connection.vendor == "sqlite"
+
+    def test_metrics(self) -> None:
+        connection = connect(self.url, alias="metrics", instrument=True)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.execute("SELECT 2")
+        connection.close()
+
+        stats = COLLECTOR.snapshot()["metrics"]
+        assert stats["opened"] == 1
+        assert stats["closed"] == 1
+        assert stats["queries"] == 2
+        assert stats["connect_latency"]["count"] == 1
+        assert stats["lifetime"]["count"] == 1
+        assert stats["queries_per_connection"]["sum"] == 2
+
+    def test_execute_wrapper_blocks_keep_counting(self) -> None:
+        connection = connect(self.url, alias="wrapped", instrument=True)
+        seen: list[str] = []
+
+        def wrapper(execute: Any, sql: str, *args: Any) -> Any:
+            seen.append(sql)
+            return execute(sql, *args)
+
+        with connection.execute_wrapper(wrapper), connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 2")
+        connection.close()
+
+        assert seen == ["SELECT 1"]
+        assert COLLECTOR.snapshot()["wrapped"]["queries"] == 2
+
+    def test_exporters(self) -> None:
+        events: list[tuple[str, str, float]] = []
+
+        def exporter(metric: str, alias: str, value: float) -> None:
+            events.append((metric, alias, value))
+
+        def broken_exporter(metric: str, alias: str, value: float) -> None:
+            raise RuntimeError
+
+        COLLECTOR.add_exporter(broken_exporter)
+        COLLECTOR.add_exporter(exporter)
+        self.addCleanup(COLLECTOR.remove_exporter, broken_exporter)
+        self.addCleanup(COLLECTOR.remove_exporter, exporter)
+
+        connection = connect(self.url, alias="exported", instrument=True)
+        with self.assertLogs(level="ERROR"):
+            connection.ensure_connection()
+            connection.close()
+
+        assert [(metric, alias) for metric, alias, _ in events] == [
+            ("connect_latency", "exported"),
+            ("connection_lifetime", "exported"),
+            ("connection_queries", "exported"),
+        ]
+        assert events[2][2] == 0
+
+
+if __name__ == "__main__":
+    unittest.main()
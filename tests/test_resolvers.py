@@ -0,0 +1,172 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import dj_database_url
+from dj_database_url.resolvers import (
+    RESOLVERS,
+    SECRET_CACHE,
+    SecretResolutionError,
+    register_resolver,
+    resolve_secret,
+)
+
+
+class ResolverTestSuite(unittest.TestCase):
+    def setUp(self) -> None:
+        SECRET_CACHE.clear()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.tmpdir, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def register(self, name: str, ttl: float = 300) -> list[str]:
+        calls: list[str] = []
+
+        @register_resolver(name, ttl=ttl)
+        def resolver(reference: str) -> str:
+            calls.append(reference)
+            return f"secret-{reference}-{len(calls)}"
+
+        self.addCleanup(RESOLVERS.pop, name)
+        return calls
+
+    def test_plain_values_are_unchanged(self) -> None:
+        assert resolve_secret("hunter2") == "hunter2"
+        assert resolve_secret("unknown:value") == "unknown:value"
+        assert resolve_secret("file:") == "file:"
+
+    def test_file_reference(self) -> None:
+        path = self.write("password", "s3cr3t\n")
+
+        assert resolve_secret(f"file:{path}") == "s3cr3t"
+
+    def test_missing_file(self) -> None:
+        path = os.path.join(self.tmpdir, "missing")
+
+        with self.assertRaises(SecretResolutionError) as cm:
+            resolve_secret(f"file:{path}")
+
+        assert str(cm.exception).startswith(f"Could not resolve secret 'file:{path}'")
+
+    @mock.patch.dict(os.environ, {"DB_PASSWORD": "from-env"})
+    def test_env_reference(self) -> None:
+        assert resolve_secret("env:DB_PASSWORD") == "from-env"
+
+    def test_missing_env_reference(self) -> None:
+        with self.assertRaisesRegex(SecretResolutionError, "variable is not set"):
+            resolve_secret("env:DJ_DATABASE_URL_MISSING")
+
+    def test_ttl_cache(self) -> None:
+        calls = self.register("vault")
+
+        assert resolve_secret("vault:db/app") == "secret-db/app-1"
+        assert resolve_secret("vault:db/app") == "secret-db/app-1"
+        assert calls == ["db/app"]
+
+        with mock.patch("time.monotonic", return_value=10**9):
+            assert resolve_secret("vault:db/app") == "secret-db/app-2"
+
+    def test_zero_ttl_disables_cache(self) -> None:
+        calls = self.register("vault", ttl=0)
+
+        resolve_secret("vault:db/app")
+        resolve_secret("vault:db/app")
+
+        assert calls == ["db/app", "db/app"]
+
+    def test_async_resolver(self) -> None:
+        @register_resolver("async-vault")
+        async def resolver(reference: str) -> str:
+            return reference.upper()
+
+        self.addCleanup(RESOLVERS.pop, "async-vault")
+
+        assert resolve_secret("async-vault:pw") == "PW"
+
+    def test_resolver_errors_are_wrapped(self) -> None:
+        @register_resolver("broken")
+        def resolver(reference: str) -> str:
+            raise ConnectionError("unreachable")
+
+        self.addCleanup(RESOLVERS.pop, "broken")
+
+        with self.assertRaisesRegex(SecretResolutionError, "unreachable"):
+            resolve_secret("broken:pw")
+
+    def test_parse_resolves_password(self) -> None:
+        self.register("vault")
+
+        url = dj_database_url.parse(
+            "postgres://user:vault:db@host/app", resolve_secrets=True
+        )
+        assert url["PASSWORD"] == "secret-db-1"
+
+    def test_parse_keeps_references_by_default(self) -> None:
+        path = self.write("password", "s3cr3t")
+        for password in ("env:DB_PASSWORD", f"file:{path}"):
+            with self.subTest(password=password):
+                url = dj_database_url.parse(
+                    f"postgres://user:{password.replace('/', '%2F')}@host/app"
+                )
+                assert url["PASSWORD"] == password
+
+    def test_parse_cache_keeps_references(self) -> None:
+        path = self.write("password", "first")
+        url = f"postgres://user:file:{path.replace('/', '%2F')}@host/app"
+
+        assert dj_database_url.parse(url, resolve_secrets=True)["PASSWORD"] == "first"
+
+        self.write("password", "second")
+        SECRET_CACHE.clear()
+
+        assert dj_database_url.parse(url, resolve_secrets=True)["PASSWORD"] == "second"
+
+    def test_config_file(self) -> None:
+        path = self.write("url", "postgres://user:pw@from-file/app\n")
+
+        with mock.patch.dict(os.environ, {"DATABASE_URL_FILE": path}, clear=True):
+            url = dj_database_url.config()
+
+        assert url["HOST"] == "from-file"
+
+    def test_config_prefers_variable_over_file(self) -> None:
+        path = self.write("url", "postgres://user:pw@from-file/app")
+        environ = {
+            "DATABASE_URL": "postgres://user:pw@from-env/app",
+            "DATABASE_URL_FILE": path,
+        }
+
+        with mock.patch.dict(os.environ, environ, clear=True):
+            url = dj_database_url.config()
+
+        assert url["HOST"] == "from-env"
+
+    def test_config_all_files(self) -> None:
+        default = self.write("default", "postgres://user:pw@primary/app")
+        replica = self.write("replica", "postgres://user:pw@replica/app")
+        environ = {
+            "DATABASE_URL_FILE": default,
+            "DATABASE_URL_REPLICA_FILE": replica,
+            "DATABASE_URL_ANALYTICS": "postgres://user:pw@warehouse/stats",
+            "DATABASE_URL_ANALYTICS_FILE": replica,
+        }
+
+        with mock.patch.dict(os.environ, environ, clear=True):
+            databases = dj_database_url.config_all()
+
+        assert {alias: db["HOST"] for alias, db in databases.items()} == {
+            "default": "primary",
+            "analytics": "warehouse",
+            "replica": "replica",
+        }
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import asyncio
+import contextvars
+import threading
+import unittest
+from collections import Counter
+from typing import Any
+from unittest import mock
+
+import dj_database_url
+from dj_database_url.lazy import LazyDatabases
+from dj_database_url.routers import (
+    ReplicaRouter,
+    StickyPrimaryMiddleware,
+    StickyReplicaRouter,
+    is_pinned_to_primary,
+    pin_to_primary,
+    sticky_scope,
+    weighted_schedule,
+)
+
+
+def databases(**replica_urls: str) -> dict[str, Any]:
+    return {
+        "default": dj_database_url.parse("postgres://user:pw@primary/app"),
+        **dj_database_url.parse_replicas(list(replica_urls.values())),
+    }
+
+
+class Instance:
+    def __init__(self, db: str) -> None:
+        self._state = type("State", (), {"db": db})()
+
+
+class WeightedScheduleTestSuite(unittest.TestCase):
+    def test_round_robin(self) -> None:
+        assert weighted_schedule({"a": 1, "b": 1, "c": 1}) == ["a", "b", "c"]
+
+    def test_weights_are_interleaved(self) -> None:
+        schedule = weighted_schedule({"a": 6, "b": 3})
+        assert schedule == ["a", "b", "a"]
+
+    def test_distribution(self) -> None:
+        schedule = weighted_schedule({"a": 5, "b": 1, "c": 1})
+        assert Counter(schedule) == {"a": 5, "b": 1, "c": 1}
+        # the heavy replica is never hit more than twice in a row
+        assert "aaa" not in "".join(schedule)
+
+    def test_empty(self) -> None:
+        assert weighted_schedule({}) == []
+
+
+class ReplicaRouterTestSuite(unittest.TestCase):
+    def test_reads_are_spread_across_replicas(self) -> None:
+        router = ReplicaRouter(
+            databases(
+                a="postgres://user:pw@replica-a/app?weight=2",
+                b="postgres://user:pw@replica-b/app",
+            )
+        )
+
+        reads = Counter(router.db_for_read(None) for _ in range(300))
+        assert reads == {"replica_0": 200, "replica_1": 100}
+        assert router.db_for_write(None) == "default"
+
+    def test_without_replicas_reads_go_to_primary(self) -> None:
+        router = ReplicaRouter(databases())
+
+        assert router.db_for_read(None) == "default"
+
+    def test_lazy_databases_are_not_parsed(self) -> None:
+        lazy = LazyDatabases(
+            {
+                "default": "postgres://user:pw@primary/app",
+                "tenant": "postgres://user:pw@tenant/app",
+            }
+        )
+        with mock.patch("dj_database_url.parse") as parse:
+            router = ReplicaRouter(lazy)
+
+        parse.assert_not_called()
+        assert router.db_for_read(None) == "default"
+
+    def test_relations_and_migrations(self) -> None:
+        router = ReplicaRouter(
+            {
+                **databases(a="postgres://user:pw@replica-a/app"),
+                "other": dj_database_url.parse("sqlite://"),
+            }
+        )
+
+        assert router.allow_relation(Instance("default"), Instance("replica_0"))
+        assert router.allow_relation(Instance("default"), Instance("other")) is None
+        assert router.allow_migrate("replica_0", "app") is False
+        assert router.allow_migrate("default", "app") is None
+        assert router.allow_migrate("other", "app") is None
+
+
+class StickyReplicaRouterTestSuite(unittest.TestCase):
+    def router(self) -> StickyReplicaRouter:
+        return StickyReplicaRouter(databases(a="postgres://user:pw@replica-a/app"))
+
+    def test_reads_stick_to_primary_after_write(self) -> None:
+        router = self.router()
+        with sticky_scope():
+            assert router.db_for_read(None) == "replica_0"
+            assert router.db_for_write(None) == "default"
+            assert router.db_for_read(None) == "default"
+            assert router.db_for_read(None) == "default"
+        with sticky_scope():
+            assert router.db_for_read(None) == "replica_0"
+
+    def test_sticky_window(self) -> None:
+        router = self.router()
+        router.sticky_window = 5
+        with sticky_scope(), mock.patch("time.monotonic", return_value=100.0):
+            router.db_for_write(None)
+            assert router.db_for_read(None) == "default"
+            with mock.patch("time.monotonic", return_value=104.9):
+                assert router.db_for_read(None) == "default"
+            with mock.patch("time.monotonic", return_value=105.0):
+                assert router.db_for_read(None) == "replica_0"
+
+    def test_longer_pin_is_not_shortened(self) -> None:
+        with sticky_scope():
+            pin_to_primary()
+            pin_to_primary(0)
+            assert is_pinned_to_primary()
+
+    def test_no_endless_pin_outside_scope(self) -> None:
+        router = self.router()
+
+        def write_and_read() -> list[str]:
+            router.db_for_write(None)
+            return [router.db_for_read(None), router.db_for_read(None)]
+
+        with mock.patch("time.monotonic", return_value=100.0):
+            assert contextvars.copy_context().run(write_and_read) == [
+                "replica_0",
+                "replica_0",
+            ]
+            router.sticky_window = 5
+            context = contextvars.copy_context()
+            assert context.run(write_and_read) == ["default", "default"]
+        with mock.patch("time.monotonic", return_value=105.0):
+            assert context.run(router.db_for_read, None) == "replica_0"
+
+    def test_pins_are_per_thread(self) -> None:
+        pinned_elsewhere: list[bool] = []
+        with sticky_scope():
+            pin_to_primary()
+            thread = threading.Thread(
+                target=lambda: pinned_elsewhere.append(is_pinned_to_primary())
+            )
+            thread.start()
+            thread.join()
+            assert is_pinned_to_primary()
+        assert pinned_elsewhere == [False]
+        assert not is_pinned_to_primary()
+
+    def test_pins_are_per_task(self) -> None:
+        async def write() -> bool:
+            with sticky_scope():
+                pin_to_primary()
+                await asyncio.sleep(0)
+                return is_pinned_to_primary()
+
+        async def read() -> bool:
+            await asyncio.sleep(0)
+            return is_pinned_to_primary()
+
+        async def main() -> list[bool]:
+            return list(await asyncio.gather(write(), read()))
+
+        assert asyncio.run(main()) == [True, False]
+
+    def test_sync_middleware(self) -> None:
+        def view(request: Any) -> bool:
+            pin_to_primary()
+            return is_pinned_to_primary()
+
+        middleware = StickyPrimaryMiddleware(view)
+        assert middleware(None) is True
+        assert not is_pinned_to_primary()
+
+    def test_async_middleware(self) -> None:
+        async def view(request: Any) -> bool:
+            assert not is_pinned_to_primary()
+            pin_to_primary()
+            return is_pinned_to_primary()
+
+        middleware = StickyPrimaryMiddleware(view)
+        assert middleware.is_async
+
+        async def main() -> tuple[bool, bool]:
+            with sticky_scope():
+                pin_to_primary()
+                response = await middleware(None)
+                return response, is_pinned_to_primary()
+
+        assert asyncio.run(main()) == (True, True)